@@ -0,0 +1,158 @@
+import threading
+import time
+
+import pandas as pd
+
+from store import YOUTH_INDICATORS
+
+# ---------------------------
+# Cohort analytics
+# ---------------------------
+# Cross-tabs, skill frequency and youth share per job for the admin Insights
+# page. SQL aggregates over only the needed columns of the analytics snapshot
+# (snapshot.py) are refined with vectorized pandas group-bys, and results are
+# cached per data version so reruns of the page do not recompute.
+AGE_GROUPS = YOUTH_INDICATORS["Age_Group"]
+EXPERIENCE_LABELS = ["None", "1-2 yrs", "3-5 yrs", "6+ yrs"]
+NOT_STATED = "Not stated"
+OTHER_AGES = "Other ages"  # an age is given but falls outside the 18-30 groups
+PLACEHOLDERS = ["", "n/a", "na", "none"]
+
+_lock = threading.Lock()
+_cache = {}  # version -> insights (only the latest version is kept)
+
+
+def _clean_text(series):
+    """Trimmed, title-cased text with placeholders mapped to NOT_STATED."""
+    text = series.fillna("").astype(str).str.strip()
+    text = text.where(~text.str.lower().isin(PLACEHOLDERS), NOT_STATED)
+    return text.str.title().where(text != NOT_STATED, NOT_STATED)
+
+
+def load_cube(conn):
+    """Application counts per age group x job x education x experience band.
+
+    The first aggregation runs in SQLite over only these columns, so pandas
+    works on a few thousand cells instead of one row per application.
+    """
+    cube = pd.read_sql_query(
+        """
+        SELECT job_applied AS job,
+               CASE WHEN age_group IS NOT NULL THEN age_group
+                    WHEN age IS NULL OR age <= 0 THEN NULL
+                    ELSE ? END AS age_group,
+               education,
+               CASE WHEN experience IS NULL OR experience <= 0 THEN 0
+                    WHEN experience <= 2 THEN 1
+                    WHEN experience <= 5 THEN 2
+                    ELSE 3 END AS experience,
+               COUNT(*) AS applications
+        FROM applicants
+        GROUP BY 1, 2, 3, 4
+        """,
+        conn,
+        params=(OTHER_AGES,),
+    )
+    cube["job"] = cube["job"].astype("category")
+    cube["age_group"] = pd.Categorical(cube["age_group"].fillna(NOT_STATED), categories=AGE_GROUPS + [OTHER_AGES, NOT_STATED])
+    cube["education"] = _clean_text(cube["education"]).astype("category")
+    cube["experience"] = pd.Categorical.from_codes(cube["experience"].to_numpy(), categories=EXPERIENCE_LABELS)
+    return cube
+
+
+def cross_tab(cube):
+    """Applications per age group x job x education x experience band (non-empty cells)."""
+    counts = cube.groupby(["age_group", "job", "education", "experience"], observed=True)["applications"].sum()
+    return counts[counts > 0].reset_index().sort_values("applications", ascending=False)
+
+
+def age_job_matrix(cube):
+    """Age group x job counts as a wide table (for a heatmap)."""
+    return pd.crosstab(cube["age_group"], cube["job"], values=cube["applications"], aggfunc="sum", dropna=False).fillna(0).astype(int)
+
+
+def youth_share_per_job(cube):
+    """Share (%) of each job's applications with a stated age that come from the 18-30 age groups.
+
+    Applications without a stated age (e.g. picture-only submissions) are
+    left out of the share and counted separately in not_stated.
+    """
+    stated = cube["age_group"] != NOT_STATED
+    youth = cube["applications"].where(cube["age_group"].isin(AGE_GROUPS), 0)
+    out = pd.DataFrame(
+        {
+            "youth": youth,
+            "stated": cube["applications"].where(stated, 0),
+            "not_stated": cube["applications"].where(~stated, 0),
+            "applications": cube["applications"],
+        }
+    ).groupby(cube["job"], observed=True).sum()
+    out["youth_share"] = (out["youth"] / out["stated"].where(out["stated"] > 0) * 100).round(1)
+    return out[["youth_share", "applications", "not_stated"]].reset_index().sort_values("youth_share", ascending=False)
+
+
+def skill_frequency(conn, top=20):
+    """Most common skills, counted once per person."""
+    per_text = pd.read_sql_query(
+        """
+        SELECT skills, COUNT(*) AS people
+        FROM (SELECT skills FROM applicants WHERE skills IS NOT NULL GROUP BY person_id)
+        GROUP BY skills
+        """,
+        conn,
+    )
+    tokens = per_text.assign(skill=per_text["skills"].str.lower().str.split(",")).explode("skill")
+    tokens["skill"] = tokens["skill"].str.strip()
+    tokens = tokens[~tokens["skill"].isin(PLACEHOLDERS)]
+    # astype: an empty result has object dtype, which nlargest rejects
+    counts = tokens.groupby("skill")["people"].sum().astype(int).nlargest(top)
+    return counts.rename_axis("skill").reset_index(name="applicants")
+
+
+def versus_indicators(cube):
+    """Applicant distribution by age group next to the baseline youth indicators."""
+    base = pd.DataFrame(YOUTH_INDICATORS)
+    counts = cube.groupby("age_group", observed=True)["applications"].sum()
+    base["Applications"] = base["Age_Group"].map(counts).fillna(0).astype(int)
+    total = base["Applications"].sum()
+    base["Share_of_Applications (%)"] = (base["Applications"] / total * 100).round(1) if total else 0.0
+    return base
+
+
+def compute_insights(conn):
+    cube = load_cube(conn)
+    applications = int(cube["applications"].sum())
+    youth = int(cube.loc[cube["age_group"].isin(AGE_GROUPS), "applications"].sum())
+    not_stated = int(cube.loc[cube["age_group"] == NOT_STATED, "applications"].sum())
+    stated = applications - not_stated
+    applicants = conn.execute("SELECT COUNT(DISTINCT person_id) FROM applicants").fetchone()[0]
+    return {
+        "applications": applications,
+        "applicants": applicants,
+        # share of applications with a stated age; the rest are reported separately
+        "youth_share": round(youth / stated * 100, 1) if stated else 0.0,
+        "age_not_stated": not_stated,
+        "cross_tab": cross_tab(cube),
+        "age_job": age_job_matrix(cube),
+        "youth_share_per_job": youth_share_per_job(cube),
+        "skills": skill_frequency(conn),
+        "vs_indicators": versus_indicators(cube),
+    }
+
+
+def get_insights(conn, version):
+    """Insights for the given data version, computed once per version.
+
+    Returns (insights, seconds spent computing; 0.0 on a cache hit).
+    """
+    with _lock:
+        hit = _cache.get(version)
+    if hit is not None:
+        return hit, 0.0
+    start = time.perf_counter()
+    insights = compute_insights(conn)
+    elapsed = time.perf_counter() - start
+    with _lock:
+        _cache.clear()
+        _cache[version] = insights
+    return insights, elapsed
@@ -0,0 +1,232 @@
+"""Headless HTTP/JSON API for kiosks and the provincial PESO system.
+
+Runs next to the Streamlit app on the same applicants.db through store.py.
+It is a small Starlette (ASGI) app served by uvicorn, both of which Streamlit
+already installs, so no extra service is needed:
+
+    python api.py --port 8600
+
+Endpoints
+    POST /api/applications              submit an application (JSON body)
+    GET  /api/applications              paginated list (?job=&name=&page=&per_page=)
+    GET  /api/counts/jobs               applications per job
+    GET  /api/indicators/youth          youth unemployment/NEET/wage indicators
+    POST /api/sync                      batch of offline outbox submissions (see outbox.py)
+
+GET responses carry an ETag derived from the data version, so unchanged data
+is answered with 304 Not Modified without running the query, and responses
+are gzip-compressed for clients that accept it.
+
+SDG8_API_TOKEN must be set: submissions (and synced outbox batches) may name
+the applicant account they belong to, so every request needs
+"Authorization: Bearer <token>" and the server refuses to start without one.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from outbox import decode_batch
+from store import (
+    DB,
+    PROFILE_FIELDS,
+    YOUTH_INDICATORS,
+    apply_submissions,
+    clean_submission,
+    clean_text,
+    connect,
+    data_version,
+    init_schema,
+    job_counts,
+    list_applications,
+    submit_application,
+)
+
+MAX_PER_PAGE = 200
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error(message, status=400):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def run_db(request, fn, *args, **kwargs):
+    """Run fn(conn, ...) on a fresh connection in the threadpool."""
+
+    def call():
+        conn = connect(request.app.state.db_path)
+        try:
+            return fn(conn, *args, **kwargs)
+        finally:
+            conn.close()
+
+    return await run_in_threadpool(call)
+
+
+async def cached_json(request, build):
+    """Answer 304 if the client's ETag matches the current data version.
+
+    Otherwise run build(conn) in the threadpool and send it as JSON.
+    """
+    version = await run_db(request, data_version)
+    etag = '"%s"' % hashlib.sha1(f"{version}|{request.url.path}?{request.url.query}".encode("utf-8")).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(await run_db(request, build), headers=headers)
+
+
+# ---------------------------
+# Handlers
+# ---------------------------
+async def get_applications(request):
+    job = request.query_params.get("job") or None
+    name = request.query_params.get("name") or None
+    try:
+        page = max(1, int(request.query_params.get("page", "1")))
+        per_page = min(MAX_PER_PAGE, max(1, int(request.query_params.get("per_page", "50"))))
+    except ValueError:
+        return error("page and per_page must be integers")
+
+    def build(conn):
+        total, rows = list_applications(conn, job=job, name=name, limit=per_page, offset=(page - 1) * per_page)
+        return {"total": total, "page": page, "per_page": per_page, "items": rows}
+
+    return await cached_json(request, build)
+
+
+def parse_submission(body):
+    """Validate a submission body; returns (username, job, profile, photo_b64)."""
+    if not isinstance(body, dict):
+        raise BadRequest("body must be a JSON object")
+
+    profile = None
+    if body.get("full_name") or body.get("address"):
+        profile = {k: body.get(k) for k in PROFILE_FIELDS if k != "age_group"}
+    try:
+        job, profile, photo_b64 = clean_submission(body.get("job"), profile, body.get("photo_base64"))
+        username = clean_text(body.get("username"), "username")
+    except ValueError as e:
+        raise BadRequest(str(e))
+    return username, job, profile, photo_b64
+
+
+async def post_application(request):
+    raw = await request.body()
+    if len(raw) > MAX_BODY_BYTES:
+        return error("body too large", status=413)
+    try:
+        username, job, profile, photo_b64 = parse_submission(json.loads(raw or b"{}"))
+    except ValueError:
+        return error("body must be JSON")
+    except BadRequest as e:
+        return error(str(e))
+
+    person_id, is_new = await run_db(request, submit_application, username, job, profile=profile, photo_b64=photo_b64)
+    return JSONResponse({"person_id": person_id, "new_application": is_new}, status_code=201 if is_new else 200)
+
+
+async def post_sync(request):
+    raw = await request.body()
+    if len(raw) > MAX_BODY_BYTES:
+        return error("body too large", status=413)
+    try:
+        if request.headers.get("content-encoding", "").lower() == "gzip":
+            submissions = decode_batch(raw)
+        else:
+            submissions = json.loads(raw or b"[]")
+    except ValueError:
+        return error("body must be a (gzip-compressed) JSON list")
+    if not isinstance(submissions, list) or not all(isinstance(sub, dict) for sub in submissions):
+        return error("body must be a JSON list of submissions")
+
+    results = await run_db(request, apply_submissions, submissions)
+    return JSONResponse({"results": results})
+
+
+async def get_job_counts(request):
+    def build(conn):
+        return [{"job": job, "count": count} for job, count in job_counts(conn)]
+
+    return await cached_json(request, build)
+
+
+async def get_youth_indicators(request):
+    def build(conn):
+        keys = list(YOUTH_INDICATORS)
+        return [dict(zip(keys, values)) for values in zip(*YOUTH_INDICATORS.values())]
+
+    return await cached_json(request, build)
+
+
+# ---------------------------
+# App
+# ---------------------------
+class TokenAuthMiddleware:
+    """Require "Authorization: Bearer <token>" on every request."""
+
+    def __init__(self, app, token):
+        self.app = app
+        self.expected = f"Bearer {token}".encode("utf-8")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not hmac.compare_digest(
+            dict(scope["headers"]).get(b"authorization", b""), self.expected
+        ):
+            await error("unauthorized", status=401)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def make_app(db_path=DB, api_token=None):
+    if not api_token:
+        raise ValueError("an API token is required")
+    conn = connect(db_path)
+    try:
+        init_schema(conn)
+    finally:
+        conn.close()
+
+    app = Starlette(
+        routes=[
+            Route("/api/applications", get_applications, methods=["GET"]),
+            Route("/api/applications", post_application, methods=["POST"]),
+            Route("/api/sync", post_sync, methods=["POST"]),
+            Route("/api/counts/jobs", get_job_counts, methods=["GET"]),
+            Route("/api/indicators/youth", get_youth_indicators, methods=["GET"]),
+        ]
+    )
+    app.state.db_path = db_path
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.add_middleware(TokenAuthMiddleware, token=api_token)
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="SDG 8 applicants HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--db", default=DB)
+    opts = parser.parse_args()
+
+    api_token = os.environ.get("SDG8_API_TOKEN")
+    if not api_token:
+        parser.error("set SDG8_API_TOKEN; the API does not run without authentication")
+    uvicorn.run(make_app(opts.db, api_token=api_token), host=opts.host, port=opts.port)
+
+
+if __name__ == "__main__":
+    main()
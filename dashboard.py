@@ -9,6 +9,33 @@ import uuid
 from PIL import Image
 import io
 
+from analytics import get_insights
+from outbox import SPOOL_MODE, default_sender, enqueue, open_outbox, pending_count, sync
+from session_memory import (
+    GLOBAL_MEMORY_CAP,
+    largest_sessions,
+    process_rss,
+    release_upload,
+    shared_bytes,
+    shared_frame,
+    total_bytes,
+    touch,
+    under_pressure,
+)
+from snapshot import SNAPSHOT_TTL, connect_snapshot, ensure_snapshot, snapshot_version
+from store import (
+    DB,
+    JOB_LIST_SIMPLE,
+    YOUTH_INDICATORS,
+    base64_to_bytes,
+    connect,
+    delete_application,
+    get_age_group,
+    get_person_photo,
+    init_schema,
+    submit_application,
+)
+
 # ---------------------------
 # Config & styles
 # ---------------------------
@@ -160,75 +187,16 @@ st.markdown(
 # ---------------------------
 # Database setup
 # ---------------------------
-DB = "applicants.db"
-conn = sqlite3.connect(DB, check_same_thread=False)
+conn = connect(DB)
 cursor = conn.cursor()
 
-# credential table
-cursor.execute(
-    """
-CREATE TABLE IF NOT EXISTS applicant_credentials (
-    username TEXT PRIMARY KEY,
-    password TEXT
-)
-"""
-)
-
-# applicants table (photo stored as base64 text: photo_blob)
-cursor.execute(
-    """
-CREATE TABLE IF NOT EXISTS applicants (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    full_name TEXT,
-    age INTEGER,
-    age_group TEXT,
-    address TEXT,
-    skills TEXT,
-    education TEXT,
-    experience INTEGER,
-    job_applied TEXT,
-    photo_blob TEXT
-)
-"""
-)
-conn.commit()
-
-
-def ensure_column(table, column, col_def):
-    cursor.execute(f"PRAGMA table_info({table})")
-    cols = [r[1] for r in cursor.fetchall()]
-    if column not in cols:
-        try:
-            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_def}")
-            conn.commit()
-        except Exception:
-            # safe ignore
-            pass
-
-
-ensure_column("applicants", "photo_blob", "TEXT")
+# credentials, persons (one profile per applicant) and applications
+init_schema(conn)
 
 # ---------------------------
 # Initial data & helpers
 # ---------------------------
-INITIAL_DATA = {
-    "Age_Group": ["18-21", "22-25", "26-30"],
-    "Unemployment_Rate (%)": [14.5, 10.2, 6.7],
-    "Underemployment_Rate (%)": [22.1, 18.4, 12.9],
-    "NEET_Rate (%)": [19.0, 16.3, 12.5],
-    "Average_Monthly_Wage (PHP)": [9500, 14500, 19800],
-}
-df_base = pd.DataFrame(INITIAL_DATA)
-
-
-def get_age_group(age: int):
-    if 18 <= age <= 21:
-        return "18-21"
-    if 22 <= age <= 25:
-        return "22-25"
-    if 26 <= age <= 30:
-        return "26-30"
-    return None
+df_base = pd.DataFrame(YOUTH_INDICATORS)
 
 
 def file_to_base64_text(uploaded_file):
@@ -240,14 +208,26 @@ def file_to_base64_text(uploaded_file):
     return b64
 
 
-def base64_to_bytes(b64_text):
-    """Return bytes from base64 text (or None)."""
-    if not b64_text:
-        return None
+def save_submission(username, job, profile=None, photo_b64=None):
+    """Store a submission centrally, or in the local outbox in spool mode.
+
+    In spool mode the logged-in account is the enumerator's, so it is only
+    recorded as registered_by and the submission is not linked to it.
+    Returns "new", "existing" (already applied for this job), "spooled" or
+    "failed" (central db locked or unreachable; nothing was stored).
+    """
+    if not SPOOL_MODE:
+        try:
+            _, is_new = submit_application(conn, username, job, profile=profile, photo_b64=photo_b64)
+        except sqlite3.OperationalError:
+            return "failed"
+        return "new" if is_new else "existing"
+    outbox = open_outbox()
     try:
-        return base64.b64decode(b64_text)
-    except Exception:
-        return None
+        enqueue(outbox, registered_by=username, job=job, profile=profile, photo_b64=photo_b64)
+    finally:
+        outbox.close()
+    return "spooled"
 
 
 # ---------------------------
@@ -308,32 +288,6 @@ def create_account(username: str, password: str):
 # ---------------------------
 # Jobs: searchable & clickable (more jobs)
 # ---------------------------
-JOB_LIST_SIMPLE = [
-    "Cashier (Local Store)",
-    "Service Crew",
-    "Data Encoder",
-    "Barangay Support Staff",
-    "Warehouse Helper",
-    "Factory Worker (Santa Barbara)",
-    "Rice Mill Operator",
-    "Municipal Office Clerk",
-    "Call Center Trainee (Iloilo City)",
-    "IT Assistant Intern",
-    "Barista",
-    "Sales Associate",
-    "Receptionist",
-    "Security Guard",
-    "Warehouse Forklift Operator",
-    "Machine Operator",
-    "Housekeeping Staff",
-    "Driver (Delivery)",
-    "Inventory Clerk",
-    "Customer Service Representative",
-    "Computer Operator",
-    "Field Enumerator",
-]
-
-
 def job_selection_ui():
     st.markdown(
         "<h4 style='color:#2d2d2d; margin-bottom:4px;'>Find a Job</h4>",
@@ -367,6 +321,36 @@ def job_selection_ui():
     return selected_job
 
 
+# ---------------------------
+# Offline outbox (spool mode)
+# ---------------------------
+def outbox_sync_ui():
+    outbox = open_outbox()
+    try:
+        pending = pending_count(outbox)
+        send = default_sender()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.info(f"Offline mode: {pending} submission(s) waiting on this device.")
+            if send is None:
+                st.warning("No sync target configured (set SDG8_SYNC_URL or SDG8_SYNC_CENTRAL); submissions stay on this device.")
+        with col2:
+            if st.button("Sync now", disabled=pending == 0 or send is None):
+                stats = sync(outbox, send)
+                st.session_state["last_sync"] = stats
+                st.rerun()
+        stats = st.session_state.get("last_sync")
+        if stats:
+            st.caption(
+                f"Last sync: {stats['sent']} sent in {stats['batches']} batch(es), {stats['per_sec']:.1f}/s, "
+                f"{stats['raw_bytes'] // 1024} KB → {stats['compressed_bytes'] // 1024} KB; results {stats['statuses'] or '-'}"
+            )
+            if stats["error"]:
+                st.warning(f"Sync stopped: {stats['error']}. Pending submissions stay on this device.")
+    finally:
+        outbox.close()
+
+
 # ---------------------------
 # Applicant Dashboard
 # ---------------------------
@@ -377,6 +361,9 @@ def show_applicant_dashboard(username: str):
     )
     st.markdown('<h4 class="section-title">Applicant Dashboard</h4>', unsafe_allow_html=True)
 
+    if SPOOL_MODE:
+        outbox_sync_ui()
+
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("### 1) Select a Job (required)", unsafe_allow_html=True)
     selected_job = job_selection_ui()
@@ -386,6 +373,9 @@ def show_applicant_dashboard(username: str):
         st.info("Please select a job first to proceed with application.")
         return
 
+    # applications are linked to the logged-in account (none for guests)
+    account = st.session_state.get("username")
+
     st.markdown("<div class='card'>", unsafe_allow_html=True)
     st.markdown("### 2) Resume Submission (choose one option)", unsafe_allow_html=True)
     option = st.radio(
@@ -394,26 +384,32 @@ def show_applicant_dashboard(username: str):
         index=0,
     )
 
+    # uploader keys change after each submit so the old upload is dropped
+    upload_round = st.session_state.get("upload_round", 0)
+
     # Option A: upload resume picture only
     if option.startswith("I have"):
         st.write("Upload a photo (scan) of your resume. If you already have one, you don't need to fill the form.")
-        uploaded = st.file_uploader("Upload resume picture (jpg/png)", type=["jpg", "jpeg", "png"], key="resume_upload")
+        uploaded = st.file_uploader("Upload resume picture (jpg/png)", type=["jpg", "jpeg", "png"], key=f"resume_upload_{upload_round}")
         if st.button("Submit Resume (upload only)"):
             if uploaded is None:
                 st.error("Please upload a resume picture before submitting.")
             else:
                 b64 = file_to_base64_text(uploaded)
-                cursor.execute(
-                    """
-                    INSERT INTO applicants (full_name, age, age_group, address, skills, education, experience, job_applied, photo_blob)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    ("N/A", 0, None, "N/A", "N/A", "N/A", 0, selected_job, b64),
-                )
-                conn.commit()
-                st.success("Resume (image) submitted successfully! You may log out or apply for another job.")
-                if "selected_job" in st.session_state:
-                    del st.session_state["selected_job"]
+                result = save_submission(account, selected_job, photo_b64=b64)
+                if result == "failed":
+                    st.error("The database is busy, so your resume was not saved. Please try again.")
+                else:
+                    release_upload(uploaded)
+                    st.session_state["upload_round"] = upload_round + 1
+                    if result == "new":
+                        st.success("Resume (image) submitted successfully! You may log out or apply for another job.")
+                    elif result == "spooled":
+                        st.success("Resume (image) saved on this device. It will be sent when you sync.")
+                    else:
+                        st.info("You already applied for this job. Your resume picture has been updated.")
+                    if "selected_job" in st.session_state:
+                        del st.session_state["selected_job"]
 
     # Option B: fill the form, optional photo upload
     else:
@@ -425,7 +421,7 @@ def show_applicant_dashboard(username: str):
             skills = st.text_input("Skills (comma separated)", key="form_skills")
             education = st.text_input("Education", key="form_education")
             experience = st.number_input("Work Experience (years)", min_value=0, max_value=50, key="form_experience")
-            photo = st.file_uploader("Upload 1x1 Photo (optional)", type=["jpg", "jpeg", "png"], key="form_photo")
+            photo = st.file_uploader("Upload 1x1 Photo (optional)", type=["jpg", "jpeg", "png"], key=f"form_photo_{upload_round}")
             submitted = st.form_submit_button("Submit Resume (form)")
 
             if submitted:
@@ -434,27 +430,29 @@ def show_applicant_dashboard(username: str):
                 else:
                     b64 = file_to_base64_text(photo) if photo else None
                     age_group = get_age_group(int(age)) if age else None
-                    cursor.execute(
-                        """
-                        INSERT INTO applicants (full_name, age, age_group, address, skills, education, experience, job_applied, photo_blob)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            full_name.strip(),
-                            int(age),
-                            age_group,
-                            address.strip(),
-                            skills.strip(),
-                            education.strip(),
-                            int(experience),
-                            selected_job,
-                            b64,
-                        ),
-                    )
-                    conn.commit()
-                    st.success("Application submitted successfully!")
-                    if "selected_job" in st.session_state:
-                        del st.session_state["selected_job"]
+                    profile = {
+                        "full_name": full_name.strip(),
+                        "age": int(age),
+                        "age_group": age_group,
+                        "address": address.strip(),
+                        "skills": skills.strip(),
+                        "education": education.strip(),
+                        "experience": int(experience),
+                    }
+                    result = save_submission(account, selected_job, profile=profile, photo_b64=b64)
+                    if result == "failed":
+                        st.error("The database is busy, so your application was not saved. Please try again.")
+                    else:
+                        release_upload(photo)
+                        st.session_state["upload_round"] = upload_round + 1
+                        if result == "new":
+                            st.success("Application submitted successfully!")
+                        elif result == "spooled":
+                            st.success("Application saved on this device. It will be sent when you sync.")
+                        else:
+                            st.info("You already applied for this job. Your profile has been updated.")
+                        if "selected_job" in st.session_state:
+                            del st.session_state["selected_job"]
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -478,45 +476,62 @@ def show_admin_panel():
     st.title("Applicant Database (Admin Panel)")
 
     # -----------------------------
-    # LOAD APPLICANT DATABASE
+    # LOAD APPLICANT SNAPSHOT (read-only copy, never locks applicants.db)
     # -----------------------------
     df = pd.DataFrame()
+    jc_df = ag_df = day_df = pd.DataFrame()
+    snapshot_age = None
     try:
-        df = pd.read_sql_query("SELECT * FROM applicants", conn)
-    except Exception:
-        df = pd.DataFrame()
+        snapshot_age = ensure_snapshot(DB, force=st.session_state.pop("refresh_snapshot", False))
+        snap = connect_snapshot()
+        try:
+            # one copy for all admin sessions, replaced when the snapshot's data changes
+            df = shared_frame("admin_applicants", snapshot_version(snap=snap), lambda: pd.read_sql_query("SELECT * FROM applicants", snap))
+            jc_df = pd.read_sql_query("SELECT job, count FROM agg_job", snap)
+            ag_df = pd.read_sql_query("SELECT age_group, count FROM agg_age_group", snap)
+            day_df = pd.read_sql_query("SELECT date, count FROM agg_date", snap)
+        finally:
+            snap.close()
+    except Exception as e:
+        st.warning(f"Analytics snapshot unavailable: {e}")
 
     # ensure columns exist for display
     if df is None or df.empty:
-        df = pd.DataFrame(columns=["id", "full_name", "age", "age_group", "address", "skills", "education", "experience", "job_applied", "photo_blob"])
+        df = pd.DataFrame(columns=["id", "full_name", "age", "age_group", "address", "skills", "education", "experience", "job_applied", "submitted_at", "has_photo", "person_id"])
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        if snapshot_age is not None:
+            st.caption(f"Analytics snapshot is {int(snapshot_age)}s old (refreshed at most every {SNAPSHOT_TTL}s).")
+    with col2:
+        if st.button("Refresh data"):
+            st.session_state["refresh_snapshot"] = True
+            st.rerun()
+        if st.button("Insights"):
+            st.session_state["stage"] = "insights"
 
     # -----------------------------
     # YOUTH EMPLOYMENT GRAPH
     # -----------------------------
     st.subheader("Youth Job Application Graph")
 
-    # compute counts safely
-    if "job_applied" in df.columns:
-        job_counts = (
-            df["job_applied"]
-            .dropna()
-            .replace("", None)
-            .dropna()
-            .value_counts()
-            .sort_index()
-        )
-    else:
-        job_counts = pd.Series(dtype=int)
-
-    if job_counts.empty:
+    if jc_df.empty:
         st.info("No job applications yet.")
     else:
-        # convert to dataframe for nicer plotting
-        jc_df = job_counts.rename_axis("job").reset_index(name="count")
         fig = px.bar(jc_df, x="job", y="count", title="Applications per Job")
         fig.update_layout(xaxis_title="Job", yaxis_title="Number of Applications", title_x=0.5)
         st.plotly_chart(fig, use_container_width=True)
 
+    if not ag_df.empty:
+        fig = px.bar(ag_df, x="age_group", y="count", title="Applications per Age Group")
+        fig.update_layout(xaxis_title="Age Group", yaxis_title="Number of Applications", title_x=0.5)
+        st.plotly_chart(fig, use_container_width=True)
+
+    if not day_df.empty:
+        fig = px.line(day_df, x="date", y="count", markers=True, title="Applications per Day")
+        fig.update_layout(xaxis_title="Date", yaxis_title="Number of Applications", title_x=0.5)
+        st.plotly_chart(fig, use_container_width=True)
+
     st.markdown("---")
 
     # -----------------------------
@@ -544,11 +559,23 @@ def show_admin_panel():
 
     # show compact table
     show_cols = [c for c in ["id", "full_name", "age", "job_applied"] if c in filtered.columns]
+    table = filtered
+    if under_pressure() and len(filtered) > 500:
+        st.warning("Server memory is high: showing the first 500 applicants. Narrow the filters to see the rest.")
+        table = filtered.head(500)
     if show_cols:
-        st.dataframe(filtered[show_cols].rename(columns={"full_name": "Full Name", "job_applied": "Job Applied"}), use_container_width=True)
+        st.dataframe(table[show_cols].rename(columns={"full_name": "Full Name", "job_applied": "Job Applied"}), use_container_width=True)
     else:
         st.write("No columns to show.")
 
+    # export straight from the snapshot
+    st.download_button(
+        label="Download filtered applicants (CSV)",
+        data=filtered.drop(columns=["has_photo"], errors="ignore").to_csv(index=False).encode("utf-8"),
+        file_name="applicants.csv",
+        mime="text/csv",
+    )
+
     st.markdown("---")
 
     # -----------------------------
@@ -567,8 +594,8 @@ def show_admin_panel():
             st.write(f"### {person.get('full_name','')}")
             st.write(f"**Job Applied:** {person.get('job_applied','')}")
 
-            # Show uploaded image (photo_blob)
-            b64 = person.get("photo_blob", None)
+            # Show uploaded image (photo_blob is only kept in the live db)
+            b64 = get_person_photo(conn, person["person_id"]) if person.get("has_photo") else None
             img_bytes = base64_to_bytes(b64)
             if img_bytes:
                 # display image
@@ -592,14 +619,31 @@ def show_admin_panel():
             if st.button("Delete Applicant"):
                 try:
                     # Delete from database
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM applicants WHERE id=?", (int(selected_id),))
-                    conn.commit()
+                    delete_application(conn, selected_id)
                     st.success("Applicant deleted successfully!")
-                    st.experimental_rerun()
+                    st.session_state["refresh_snapshot"] = True
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Failed to delete applicant: {e}")
 
+    st.markdown("---")
+
+    # -----------------------------
+    # SERVER MEMORY (largest sessions)
+    # -----------------------------
+    with st.expander("Server memory by session"):
+        rss = process_rss()
+        st.write(
+            f"Tracked memory: **{total_bytes() / 1024 / 1024:.1f} MB** of {GLOBAL_MEMORY_CAP / 1024 / 1024:.0f} MB cap"
+            f" (shared frames: {shared_bytes() / 1024 / 1024:.1f} MB)"
+            + (f" · process RSS: **{rss / 1024 / 1024:.1f} MB**" if rss else "")
+        )
+        sessions = largest_sessions()
+        if sessions:
+            st.dataframe(pd.DataFrame(sessions), use_container_width=True)
+        else:
+            st.write("No sessions tracked yet.")
+
     st.markdown("---")
     col1, col2 = st.columns([1, 1])
     with col1:
@@ -613,6 +657,78 @@ def show_admin_panel():
             st.session_state["stage"] = "login"
 
 
+# ---------------------------
+# Insights (cohort analytics, admin only)
+# ---------------------------
+def show_insights():
+    st.title("Applicant Insights")
+
+    insights = None
+    try:
+        ensure_snapshot(DB)
+        snap = connect_snapshot()
+        try:
+            insights, elapsed = get_insights(snap, snapshot_version(snap=snap))
+        finally:
+            snap.close()
+    except Exception as e:
+        st.warning(f"Analytics snapshot unavailable: {e}")
+
+    if insights is None or insights["applications"] == 0:
+        st.info("No job applications yet.")
+    else:
+        st.caption(
+            "From the analytics snapshot; "
+            + (f"computed in {elapsed * 1000:.0f} ms." if elapsed else "cached until the data changes.")
+        )
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Applications", f"{insights['applications']:,}")
+        col2.metric("Applicants", f"{insights['applicants']:,}")
+        col3.metric(
+            "Youth share (18-30)",
+            f"{insights['youth_share']}%",
+            help=f"Of applications with a stated age; {insights['age_not_stated']:,} without one are left out.",
+        )
+
+        st.subheader("Applicants vs Youth Indicators")
+        st.dataframe(insights["vs_indicators"], use_container_width=True)
+
+        st.subheader("Youth Share per Job")
+        fig = px.bar(insights["youth_share_per_job"], x="job", y="youth_share", hover_data=["applications", "not_stated"], title="Share of Applications from Ages 18-30 (stated ages only)")
+        fig.update_layout(xaxis_title="Job", yaxis_title="Youth Share (%)", title_x=0.5)
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("Age Group × Job")
+        fig = px.imshow(insights["age_job"], text_auto=True, aspect="auto", color_continuous_scale="YlOrBr")
+        fig.update_layout(xaxis_title="Job", yaxis_title="Age Group")
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("Age Group × Job × Education × Experience")
+        ct = insights["cross_tab"]
+        col1, col2 = st.columns(2)
+        with col1:
+            age_filter = st.selectbox("Age group:", ["All"] + list(ct["age_group"].cat.categories))
+        with col2:
+            edu_filter = st.selectbox("Education:", ["All"] + sorted(ct["education"].cat.categories))
+        if age_filter != "All":
+            ct = ct[ct["age_group"] == age_filter]
+        if edu_filter != "All":
+            ct = ct[ct["education"] == edu_filter]
+        st.dataframe(ct.head(200), use_container_width=True, hide_index=True)
+
+        st.subheader("Top Skills")
+        if insights["skills"].empty:
+            st.write("No skills listed yet.")
+        else:
+            fig = px.bar(insights["skills"], x="applicants", y="skill", orientation="h", title="Most Common Skills")
+            fig.update_layout(yaxis=dict(autorange="reversed"), xaxis_title="Applicants", yaxis_title="", title_x=0.5)
+            st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("---")
+    if st.button("⬅ Back to Admin Panel"):
+        st.session_state["stage"] = "admin_panel"
+
+
 # ---------------------------
 # Youth charts
 # ---------------------------
@@ -758,6 +874,7 @@ if "stage" not in st.session_state:
     st.session_state["stage"] = "intro"
 
 stage = st.session_state["stage"]
+touch(st.session_state, user=st.session_state.get("username"), stage=stage)
 
 if stage == "intro":
     intro_screen()
@@ -776,6 +893,9 @@ elif stage == "admin_panel":
     except st.errors.StreamlitAPIException:
         st.experimental_rerun()
 
+elif stage == "insights":
+    show_insights()
+
 elif stage == "charts":
     show_youth_charts()
 
@@ -0,0 +1,237 @@
+"""Load-test harness: simulated concurrent Streamlit sessions.
+
+Drives dashboard.py through streamlit.testing.v1.AppTest. AppTest keeps a
+process-wide runtime, so every concurrent session gets its own worker process
+(each running its sessions back to back) and they all hit the same database:
+
+    applicant: intro -> login (create account) -> dashboard -> select job -> submit form
+    admin:     login as admin -> admin panel (snapshot refresh) -> filter by job
+
+Each concurrency level runs its sessions against a scratch copy of the app and
+database (the real applicants.db is never touched) and reports sessions/sec,
+error rates (locked database, failed submits, other exceptions) and per-step
+latency percentiles:
+
+    python loadtest.py --levels 1,2,4,8 --sessions-per-worker 3 --admin-share 0.25 2>/dev/null
+
+(Streamlit's own warnings go to stderr; the report goes to stdout.)
+
+Streamlit re-executes dashboard.py on every rerun, so its module-level
+`conn = connect(DB)` is a fresh connection per script run, under
+`streamlit run` just as here; the numbers cover the same SQLite locking
+between concurrent runs. What differs is that real sessions share one server
+process (GIL, memory), while here each worker is a process of its own.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from streamlit.testing.v1 import AppTest
+
+APP_ASSETS = ["logo.png"]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class SessionFailed(Exception):
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+def classify(message):
+    text = str(message).lower()
+    if "locked" in text or "busy" in text:
+        return "db_locked"
+    if "commit" in text or "transaction" in text:
+        return "failed_commit"
+    return "exception"
+
+
+def by_label(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise SessionFailed("missing_widget", f"widget {label!r} not rendered")
+
+
+class Session:
+    """One simulated browser session; records the latency of every script run."""
+
+    def __init__(self, timeout):
+        self.at = AppTest.from_file(os.path.join(os.getcwd(), "dashboard.py"), default_timeout=timeout)
+        self.latencies = []
+
+    def run(self, widget=None):
+        start = time.perf_counter()
+        if widget is None:
+            self.at.run()
+        else:
+            widget.run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.at.exception:
+            message = self.at.exception[0].value
+            raise SessionFailed(classify(message), message)
+        return self.at
+
+    def click(self, label):
+        """Click a button; rerun once more if it switched stage (as the next browser event would)."""
+        stage = self.at.session_state["stage"]
+        self.run(by_label(self.at.button, label).click())
+        if self.at.session_state["stage"] != stage:
+            self.run()
+
+    def login(self, user_type, username, password, button):
+        self.click("Click to Proceed to Login")
+        by_label(self.at.selectbox, "Select User Type:").select(user_type)
+        by_label(self.at.text_input, "Username:").input(username)
+        by_label(self.at.text_input, "Password:").input(password)
+        self.click(button)
+
+
+def applicant_flow(session):
+    username = f"load_{uuid.uuid4().hex[:12]}"
+    session.run()
+    session.login("Applicant", username, "pw", "Create Account")
+    if session.at.session_state["stage"] != "dashboard":
+        raise SessionFailed(classify(" ".join(e.value for e in session.at.error)), "account creation failed")
+
+    session.run(session.at.button(key="job_0").click())
+    session.run(session.at.radio[0].set_value("I don't have a resume picture (fill the form)"))
+    session.at.text_input(key="form_name").input(f"Load Test {username}")
+    session.at.number_input(key="form_age").set_value(21)
+    session.at.text_area(key="form_address").input("Santa Barbara, Iloilo")
+    session.click("Submit Resume (form)")
+    if not any("submitted successfully" in s.value for s in session.at.success):
+        errors = " ".join(e.value for e in session.at.error)
+        raise SessionFailed("failed_submit" if not errors else classify(errors), errors or "no success message")
+
+
+def admin_flow(session):
+    session.run()
+    session.login("Admin", "admin", "1234", "Login")
+    if session.at.session_state["stage"] != "admin_panel":
+        raise SessionFailed("exception", "admin login failed")
+    session.at.session_state["refresh_snapshot"] = True
+    session.run()  # forced snapshot rebuild from the live db
+    # the admin panel reports snapshot/read failures as a warning, not an exception
+    for w in session.at.warning:
+        if w.value.startswith("Analytics snapshot unavailable"):
+            raise SessionFailed(classify(w.value), w.value)
+    job_filter = by_label(session.at.selectbox, "Filter by job applied:")
+    if len(job_filter.options) > 1:
+        session.run(job_filter.select_index(1))
+
+
+def run_session(kind, timeout):
+    session = Session(timeout)
+    start = time.perf_counter()
+    error = None
+    try:
+        (admin_flow if kind == "admin" else applicant_flow)(session)
+    except SessionFailed as e:
+        error = e.kind
+    except Exception as e:  # a crash in the harness itself still counts as a failed session
+        error = classify(e)
+    return {"kind": kind, "error": error, "duration": time.perf_counter() - start, "latencies": session.latencies}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def init_worker(workdir):
+    os.chdir(workdir)  # dashboard.py opens applicants.db relative to the cwd
+
+
+def warm_up(_):
+    time.sleep(0.2)
+
+
+def run_level(workdir, workers, sessions, admin_share, timeout):
+    kinds = ["admin" if i < round(sessions * admin_share) else "applicant" for i in range(sessions)]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=init_worker, initargs=(workdir,)) as pool:
+        # start every worker process before the clock starts
+        list(pool.map(warm_up, range(workers)))
+        start = time.perf_counter()
+        results = list(pool.map(partial(run_session, timeout=timeout), kinds))
+        elapsed = time.perf_counter() - start
+
+    latencies = [l for r in results for l in r["latencies"]]
+    errors = Counter(r["error"] for r in results if r["error"])
+    failed = sum(errors.values())
+    return {
+        "workers": workers,
+        "sessions": sessions,
+        "sessions_per_sec": sessions / elapsed if elapsed else 0.0,
+        "error_rate": failed / sessions if sessions else 0.0,
+        "errors": dict(errors),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+    }
+
+
+def prepare_workdir(seed_db):
+    """Scratch copy of the app so the load never writes to the real database."""
+    workdir = tempfile.mkdtemp(prefix="sdg8_load_")
+    for path in glob.glob(os.path.join(HERE, "*.py")) + [os.path.join(HERE, name) for name in APP_ASSETS]:
+        shutil.copy(path, workdir)
+    if seed_db:
+        src = sqlite3.connect(seed_db)
+        dst = sqlite3.connect(os.path.join(workdir, "applicants.db"))
+        src.backup(dst)
+        src.close()
+        dst.close()
+    return workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions against dashboard.py")
+    parser.add_argument("--levels", default="1,2,4,8", help="comma separated concurrency levels")
+    parser.add_argument("--sessions-per-worker", type=int, default=3)
+    parser.add_argument("--admin-share", type=float, default=0.25, help="fraction of sessions running the admin flow")
+    parser.add_argument("--seed-db", default=None, help="copy this database into the scratch dir first")
+    parser.add_argument("--timeout", type=float, default=60, help="per script run timeout (seconds)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch dir for inspection")
+    opts = parser.parse_args()
+
+    workdir = prepare_workdir(opts.seed_db)
+    try:
+        # a single session first creates the schema so workers do not race on CREATE TABLE
+        run_level(workdir, 1, 1, 1.0, opts.timeout)
+        print("one worker process per concurrent session; every script run opens its own db connection")
+        print(f"{'workers':>7} {'sessions':>8} {'sess/s':>7} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  errors")
+        for workers in [int(x) for x in opts.levels.split(",") if x.strip()]:
+            r = run_level(workdir, workers, workers * opts.sessions_per_worker, opts.admin_share, opts.timeout)
+            print(
+                f"{r['workers']:>7} {r['sessions']:>8} {r['sessions_per_sec']:>7.2f} {r['error_rate'] * 100:>5.1f}%"
+                f" {r['p50'] * 1000:>8.0f} {r['p95'] * 1000:>8.0f} {r['p99'] * 1000:>8.0f}  {r['errors'] or '-'}"
+            )
+    finally:
+        if opts.keep:
+            print(f"scratch dir kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # AppTest replaces sys.modules["__main__"] inside the workers, so the
+    # functions sent to them must live in the importable loadtest module
+    import loadtest
+
+    loadtest.main()
@@ -0,0 +1,274 @@
+"""Offline-first submission outbox for field registration.
+
+In spool mode (SDG8_SPOOL_MODE=1) the Streamlit app writes submissions to a
+local SQLite outbox instead of the central applicants.db. When connectivity
+returns, pending submissions are pushed in gzip-compressed JSON batches,
+either to the central HTTP API (api.py, POST /api/sync) or straight into a
+central database file. Every submission carries a client-generated UUID, so a
+batch that is re-sent after a dropped connection is applied only once.
+
+There is no default target: the device's own applicants.db is not the
+central database, so sync needs SDG8_SYNC_URL / SDG8_SYNC_CENTRAL (or
+--url / --central on the command line).
+
+    python outbox.py status
+    python outbox.py sync --url http://peso-server:8600/api/sync
+    python outbox.py sync --central /path/to/applicants.db
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+
+from store import apply_submissions, connect, init_schema, now_text
+
+OUTBOX_DB = os.environ.get("SDG8_OUTBOX_DB", "outbox.db")
+SPOOL_MODE = os.environ.get("SDG8_SPOOL_MODE") == "1"
+SYNC_URL = os.environ.get("SDG8_SYNC_URL")  # e.g. http://peso-server:8600/api/sync
+SYNC_CENTRAL = os.environ.get("SDG8_SYNC_CENTRAL")  # or a central database file, e.g. on a share
+SYNC_BATCH_SIZE = 50
+# compressed bytes per batch; stays under the API's 8 MiB body limit
+# (api.MAX_BODY_BYTES). base64 photos barely compress, so a few resume
+# pictures can fill a batch long before SYNC_BATCH_SIZE rows.
+SYNC_MAX_BATCH_BYTES = 7 * 1024 * 1024
+SYNC_TIMEOUT = 30  # seconds per batch
+
+
+def open_outbox(path=OUTBOX_DB):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS outbox (
+        uuid TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        synced_at TEXT
+    )
+    """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status)")
+    conn.commit()
+    return conn
+
+
+def enqueue(conn, registered_by, job, profile=None, photo_b64=None):
+    """Spool one submission locally; returns its UUID.
+
+    registered_by is the account logged in on the device (usually the
+    enumerator), recorded for the audit trail only. The submission is not
+    tied to that account, so the central side matches the applicant by name,
+    photo and age like any other account-less submission.
+    """
+    sub_id = str(uuid.uuid4())
+    created_at = now_text()
+    payload = {
+        "uuid": sub_id,
+        "created_at": created_at,
+        "username": None,
+        "registered_by": registered_by,
+        "job": job,
+        "profile": profile,
+        "photo_b64": photo_b64,
+    }
+    conn.execute(
+        "INSERT INTO outbox (uuid, created_at, payload) VALUES (?, ?, ?)",
+        (sub_id, created_at, json.dumps(payload)),
+    )
+    conn.commit()
+    return sub_id
+
+
+def upgrade_payload(sub):
+    """Submissions spooled before registered_by existed carried the device
+    account as username; move it over so it does not claim the applicant."""
+    if "registered_by" not in sub:
+        sub["registered_by"] = sub.get("username")
+        sub["username"] = None
+    return sub
+
+
+def pending_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM outbox WHERE status='pending'").fetchone()[0]
+
+
+def status_counts(conn):
+    return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+
+# ---------------------------
+# Batches
+# ---------------------------
+def encode_batch(submissions):
+    return gzip.compress(json.dumps(submissions).encode("utf-8"))
+
+
+def decode_batch(blob, max_bytes=64 * 1024 * 1024):
+    """Inverse of encode_batch; raises ValueError for corrupt batches and for
+    batches that inflate beyond max_bytes."""
+    try:
+        with gzip.GzipFile(fileobj=io.BytesIO(blob)) as f:
+            raw = f.read(max_bytes + 1)
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"corrupt batch: {e}") from e
+    if len(raw) > max_bytes:
+        raise ValueError("batch too large")
+    submissions = json.loads(raw)
+    if not isinstance(submissions, list):
+        raise ValueError("batch must be a JSON list")
+    return submissions
+
+
+def local_sender(central_path):
+    """Send batches straight into a central database file (e.g. on a share)."""
+
+    def send(blob):
+        conn = connect(central_path)
+        try:
+            init_schema(conn)
+            return apply_submissions(conn, decode_batch(blob))
+        finally:
+            conn.close()
+
+    return send
+
+
+def http_sender(url=SYNC_URL, token=None, timeout=SYNC_TIMEOUT):
+    """Send batches to the central API's POST /api/sync."""
+    token = token or os.environ.get("SDG8_API_TOKEN")
+
+    def send(blob):
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        req = urllib.request.Request(url, data=blob, headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())["results"]
+
+    return send
+
+
+def default_sender():
+    """Sender for the configured sync target, or None if none is configured."""
+    if SYNC_URL:
+        return http_sender(SYNC_URL)
+    if SYNC_CENTRAL:
+        return local_sender(SYNC_CENTRAL)
+    return None
+
+
+# ---------------------------
+# Sync
+# ---------------------------
+def sync(conn, send, batch_size=SYNC_BATCH_SIZE, max_bytes=SYNC_MAX_BATCH_BYTES):
+    """Push pending submissions oldest first; stops quietly at the first network error.
+
+    Batches hold at most batch_size submissions and about max_bytes of
+    payload. A submission too large to send even on its own (or refused by
+    the server with 413) is marked "too_large" so it cannot hold up the rest
+    of the queue.
+
+    Returns throughput stats: batches, submissions sent, per-status counts,
+    raw vs compressed bytes, elapsed seconds and submissions/second.
+    """
+    stats = {"batches": 0, "sent": 0, "raw_bytes": 0, "compressed_bytes": 0, "statuses": {}, "error": None}
+    start = time.perf_counter()
+    limit = max_bytes
+    while True:
+        rows = conn.execute(
+            "SELECT uuid, payload FROM outbox WHERE status='pending' ORDER BY rowid LIMIT ?",
+            (batch_size,),
+        ).fetchall()
+        if not rows:
+            break
+        # always take the oldest row; add more while the raw JSON fits
+        # (gzip output is never much larger than its input)
+        batch, size = rows[:1], len(rows[0][1])
+        for sub_id, payload in rows[1:]:
+            if size + len(payload) > limit:
+                break
+            batch.append((sub_id, payload))
+            size += len(payload)
+
+        submissions = [upgrade_payload(json.loads(payload)) for _, payload in batch]
+        blob = encode_batch(submissions)
+        too_large = len(blob) > limit
+        if not too_large:
+            try:
+                results = send(blob)
+            except urllib.error.HTTPError as e:
+                if e.code != 413:
+                    stats["error"] = str(e)
+                    break
+                too_large = True
+            except (OSError, sqlite3.OperationalError) as e:
+                # offline or central db unreachable: everything stays queued for the next try
+                stats["error"] = str(e)
+                break
+        if too_large:
+            if len(batch) > 1:
+                limit = max(1, size // 2)  # retry with smaller batches
+            else:
+                conn.execute("UPDATE outbox SET status='too_large' WHERE uuid=?", (batch[0][0],))
+                conn.commit()
+                stats["statuses"]["too_large"] = stats["statuses"].get("too_large", 0) + 1
+            continue
+
+        synced_at = now_text()
+        for sub_id, _ in batch:
+            status = results.get(sub_id)
+            if status is None:
+                continue
+            conn.execute("UPDATE outbox SET status=?, synced_at=? WHERE uuid=?", (status, synced_at, sub_id))
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+        conn.commit()
+
+        stats["batches"] += 1
+        stats["sent"] += len(batch)
+        stats["raw_bytes"] += size
+        stats["compressed_bytes"] += len(blob)
+        if not any(sub_id in results for sub_id, _ in batch):
+            stats["error"] = "central server acknowledged none of the batch"
+            break
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["per_sec"] = stats["sent"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline submission outbox")
+    parser.add_argument("command", choices=["status", "sync"])
+    parser.add_argument("--outbox", default=OUTBOX_DB)
+    parser.add_argument("--url", default=SYNC_URL, help="central API sync endpoint")
+    parser.add_argument("--central", default=SYNC_CENTRAL, help="central database file (instead of --url)")
+    parser.add_argument("--batch-size", type=int, default=SYNC_BATCH_SIZE)
+    opts = parser.parse_args()
+
+    if opts.command == "sync" and not (opts.url or opts.central):
+        parser.error("no sync target: pass --url or --central (or set SDG8_SYNC_URL / SDG8_SYNC_CENTRAL)")
+
+    conn = open_outbox(opts.outbox)
+    if opts.command == "sync":
+        send = http_sender(opts.url) if opts.url else local_sender(opts.central)
+        stats = sync(conn, send, opts.batch_size)
+        print(
+            f"synced {stats['sent']} submissions in {stats['batches']} batches, {stats['seconds']:.2f}s"
+            f" ({stats['per_sec']:.1f}/s), {stats['raw_bytes']} -> {stats['compressed_bytes']} bytes"
+        )
+        print(f"results: {stats['statuses'] or '-'}")
+        if stats["error"]:
+            print(f"stopped early: {stats['error']}")
+    print(f"outbox: {status_counts(conn) or 'empty'}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
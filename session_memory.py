@@ -0,0 +1,198 @@
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+# ---------------------------
+# Per-session memory accounting
+# ---------------------------
+# Every Streamlit session registers the uploads it holds in a process-wide
+# registry. Idle sessions are swept and uploads are released after submit.
+# Large read-only frames (the admin applicants table) are shared: one copy per
+# process, replaced when its version changes, instead of one per session.
+SESSION_IDLE_TIMEOUT = 15 * 60  # seconds
+SWEEP_INTERVAL = 30  # seconds
+GLOBAL_MEMORY_CAP = int(os.environ.get("SDG8_MEMORY_CAP_MB", "512")) * 1024 * 1024
+
+_lock = threading.RLock()
+_sessions = {}  # session_id -> {"user", "stage", "last_seen", "upload_bytes"}
+_shared = {}  # name -> (version, frame, nbytes); one process-wide copy per name
+_last_sweep = 0.0
+
+
+def current_session_id():
+    """Id of the Streamlit session running this script (None outside Streamlit)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+    except Exception:
+        return None
+    return ctx.session_id if ctx else None
+
+
+def _uploaded_file_mgr():
+    try:
+        from streamlit import runtime
+
+        if runtime.exists():
+            return runtime.get_instance().uploaded_file_mgr
+    except Exception:
+        pass
+    return None
+
+
+def sizeof(obj):
+    """Approximate bytes held by obj (deep for DataFrames and uploads)."""
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if hasattr(obj, "file_id") and hasattr(obj, "size"):  # streamlit UploadedFile
+        return int(obj.size)
+    if isinstance(obj, (list, tuple)):
+        return sum(sizeof(o) for o in obj)
+    return sys.getsizeof(obj)
+
+
+def _entry(session_id):
+    return _sessions.setdefault(
+        session_id, {"user": None, "stage": None, "last_seen": time.time(), "upload_bytes": 0}
+    )
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+def touch(session_state, user=None, stage=None):
+    """Record activity and current upload footprint for this session; sweep if due."""
+    session_id = current_session_id()
+    if session_id is None:
+        return
+    uploads = 0
+    for key in list(session_state.keys()):
+        try:
+            value = session_state[key]
+        except Exception:
+            continue
+        if hasattr(value, "file_id") or (isinstance(value, list) and value and hasattr(value[0], "file_id")):
+            uploads += sizeof(value)
+    with _lock:
+        entry = _entry(session_id)
+        entry.update(user=user, stage=stage, last_seen=time.time(), upload_bytes=uploads)
+    maybe_sweep()
+
+
+def shared_frame(name, version, loader):
+    """DataFrame shared by all sessions of this process, reloaded when version changes.
+
+    Only the latest version is kept. Callers must treat it as read-only
+    (copy before modifying).
+    """
+    with _lock:
+        hit = _shared.get(name)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    frame = loader()
+    with _lock:
+        _shared[name] = (version, frame, sizeof(frame))
+    return frame
+
+
+def release_upload(uploaded):
+    """Free an uploaded file's bytes as soon as it has been stored."""
+    session_id = current_session_id()
+    mgr = _uploaded_file_mgr()
+    if uploaded is None or session_id is None or mgr is None:
+        return
+    try:
+        mgr.remove_file(session_id, uploaded.file_id)
+    except Exception:
+        pass
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry is not None:
+            entry["upload_bytes"] = max(0, entry["upload_bytes"] - sizeof(uploaded))
+
+
+# ---------------------------
+# Eviction
+# ---------------------------
+def shared_bytes():
+    with _lock:
+        return sum(nbytes for _, _, nbytes in _shared.values())
+
+
+def total_bytes():
+    with _lock:
+        return sum(e["upload_bytes"] for e in _sessions.values()) + shared_bytes()
+
+
+def under_pressure():
+    return total_bytes() > GLOBAL_MEMORY_CAP
+
+
+def maybe_sweep():
+    global _last_sweep
+    now = time.time()
+    if now - _last_sweep >= SWEEP_INTERVAL or under_pressure():
+        _last_sweep = now
+        sweep(now)
+
+
+def sweep(now=None):
+    """Evict idle sessions and the uploads they still hold."""
+    now = now or time.time()
+    current = current_session_id()
+    mgr = _uploaded_file_mgr()
+    with _lock:
+        for session_id, entry in list(_sessions.items()):
+            if session_id != current and now - entry["last_seen"] > SESSION_IDLE_TIMEOUT:
+                if mgr is not None:
+                    try:
+                        mgr.remove_session_files(session_id)
+                    except Exception:
+                        pass
+                del _sessions[session_id]
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def largest_sessions(n=10):
+    """Sessions with the largest footprint, biggest first."""
+    now = time.time()
+    with _lock:
+        rows = [
+            {
+                "session": session_id[:8],
+                "user": entry["user"] or "",
+                "stage": entry["stage"] or "",
+                "uploads_kb": round(entry["upload_bytes"] / 1024, 1),
+                "idle_s": int(now - entry["last_seen"]),
+            }
+            for session_id, entry in _sessions.items()
+        ]
+    return sorted(rows, key=lambda r: r["uploads_kb"], reverse=True)[:n]
+
+
+def process_rss():
+    """Resident set size of this process in bytes (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
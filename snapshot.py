@@ -0,0 +1,173 @@
+import os
+import sqlite3
+import time
+import uuid
+
+from store import data_version
+
+# ---------------------------
+# Read-only analytics snapshot
+# ---------------------------
+# Admin charts, lists and exports read from a separate SQLite file that is
+# rebuilt from applicants.db at most every SNAPSHOT_TTL seconds (and only if
+# the data version changed), so heavy admin reads never hold locks on the live
+# database that applicants write to.
+SOURCE_DB = "applicants.db"
+SNAPSHOT_DB = "applicants_snapshot.db"
+SNAPSHOT_TTL = 60  # seconds
+
+# columns copied into the snapshot, one row per application
+# (photo_blob stays in the live db only)
+SNAPSHOT_COLUMNS = [
+    "person_id",
+    "full_name",
+    "age",
+    "age_group",
+    "address",
+    "skills",
+    "education",
+    "experience",
+    "job_applied",
+    "submitted_at",
+]
+
+SOURCE_QUERY = """
+    SELECT a.id, a.person_id, p.full_name, p.age, p.age_group, p.address, p.skills,
+           p.education, p.experience, a.job AS job_applied, a.submitted_at,
+           p.photo_blob IS NOT NULL AS has_photo
+    FROM applications a JOIN persons p ON p.id = a.person_id
+    ORDER BY a.id
+"""
+
+
+def build_snapshot(source=SOURCE_DB, target=SNAPSHOT_DB):
+    """Copy applications (without photos) and per-job/age/date aggregates into target.
+
+    The snapshot is written to a temporary file and swapped in with os.replace,
+    so readers of the old snapshot are never blocked or see a half-built file.
+    """
+    tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        src.execute("BEGIN")  # one read transaction: rows and version match
+        version = data_version(src)
+        rows = src.execute(SOURCE_QUERY).fetchall()
+    finally:
+        src.close()
+
+    dst = sqlite3.connect(tmp)
+    try:
+        dst.execute(
+            f"""
+            CREATE TABLE applicants (
+                id INTEGER PRIMARY KEY,
+                {", ".join(SNAPSHOT_COLUMNS)},
+                has_photo INTEGER
+            )
+            """
+        )
+        placeholders = ", ".join("?" * (len(SNAPSHOT_COLUMNS) + 2))
+        dst.executemany(f"INSERT INTO applicants VALUES ({placeholders})", rows)
+
+        # covering indexes for the cohort group-bys in analytics.py
+        dst.execute("CREATE INDEX idx_cohort ON applicants(job_applied, age_group, education, experience)")
+        dst.execute("CREATE INDEX idx_person_skills ON applicants(person_id, skills)")
+
+        # columnar aggregates: one narrow table per dimension
+        dst.execute(
+            """
+            CREATE TABLE agg_job AS
+            SELECT job_applied AS job, COUNT(*) AS count FROM applicants
+            WHERE job_applied IS NOT NULL AND TRIM(job_applied) != ''
+            GROUP BY job_applied ORDER BY job_applied
+            """
+        )
+        dst.execute(
+            """
+            CREATE TABLE agg_age_group AS
+            SELECT age_group, COUNT(*) AS count FROM applicants
+            WHERE age_group IS NOT NULL
+            GROUP BY age_group ORDER BY age_group
+            """
+        )
+        dst.execute(
+            """
+            CREATE TABLE agg_date AS
+            SELECT substr(submitted_at, 1, 10) AS date, COUNT(*) AS count FROM applicants
+            WHERE submitted_at IS NOT NULL
+            GROUP BY date ORDER BY date
+            """
+        )
+        dst.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        dst.execute("INSERT INTO meta VALUES ('built_at', ?)", (repr(time.time()),))
+        dst.execute("INSERT INTO meta VALUES ('data_version', ?)", (version,))
+        dst.commit()
+    finally:
+        dst.close()
+
+    os.replace(tmp, target)
+    return target
+
+
+def _meta(target, key):
+    if not os.path.exists(target):
+        return None
+    try:
+        snap = sqlite3.connect(f"file:{target}?mode=ro", uri=True)
+        try:
+            row = snap.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        finally:
+            snap.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def snapshot_built_at(target=SNAPSHOT_DB):
+    """Epoch seconds of the last build, or None if there is no usable snapshot."""
+    value = _meta(target, "built_at")
+    return float(value) if value is not None else None
+
+
+def snapshot_version(target=SNAPSHOT_DB, snap=None):
+    """store.data_version of the source when the snapshot was built (or None).
+
+    Use it as the cache key for anything derived from the snapshot; pass the
+    open snapshot connection so the key matches the data read through it
+    even if a rebuild swaps the file in between."""
+    if snap is not None:
+        row = snap.execute("SELECT value FROM meta WHERE key='data_version'").fetchone()
+        return row[0] if row else None
+    return _meta(target, "data_version")
+
+
+def snapshot_age(target=SNAPSHOT_DB):
+    """Seconds since the snapshot was built (None if missing)."""
+    built_at = snapshot_built_at(target)
+    if built_at is None:
+        return None
+    return max(0.0, time.time() - built_at)
+
+
+def ensure_snapshot(source=SOURCE_DB, target=SNAPSHOT_DB, ttl=SNAPSHOT_TTL, force=False):
+    """Rebuild the snapshot if forced, missing, or older than ttl and behind the
+    source's data version. Returns its age (0 once checked to be current)."""
+    age = snapshot_age(target)
+    if force or age is None:
+        build_snapshot(source, target)
+        return 0.0
+    if age > ttl:
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            current = data_version(src)
+        finally:
+            src.close()
+        if current != snapshot_version(target):
+            build_snapshot(source, target)
+        age = 0.0
+    return age
+
+
+def connect_snapshot(target=SNAPSHOT_DB):
+    """Open the snapshot read-only."""
+    return sqlite3.connect(f"file:{target}?mode=ro", uri=True, check_same_thread=False)
@@ -0,0 +1,576 @@
+import base64
+import binascii
+import io
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime
+
+from PIL import Image
+
+# ---------------------------
+# Connection
+# ---------------------------
+# Shared data-access layer for the Streamlit app (dashboard.py) and the
+# headless HTTP API (api.py).
+DB = "applicants.db"
+
+
+def connect(path=DB):
+    """Open the applicants database (WAL, usable from any thread)."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL lets snapshot/API reads run while applicants keep writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+# ---------------------------
+# Schema
+# ---------------------------
+# Profile data is stored once per person (linked to applicant_credentials when
+# the applicant is logged in); each job applied for is a lightweight row in
+# applications. The old flat `applicants` table is migrated once and then left
+# untouched.
+SCHEMA_VERSION = 1
+
+PROFILE_FIELDS = ["full_name", "age", "age_group", "address", "skills", "education", "experience"]
+
+# placeholder profile for "upload resume picture only" submissions
+EMPTY_PROFILE = {
+    "full_name": "N/A",
+    "age": 0,
+    "age_group": None,
+    "address": "N/A",
+    "skills": "N/A",
+    "education": "N/A",
+    "experience": 0,
+}
+
+
+def ensure_column(conn, table, column, col_def):
+    cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+    if column not in cols:
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_def}")
+            conn.commit()
+        except Exception:
+            # safe ignore
+            pass
+
+
+def init_schema(conn):
+    """Create tables/indexes and migrate legacy applicants rows once."""
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS applicant_credentials (
+        username TEXT PRIMARY KEY,
+        password TEXT
+    )
+    """
+    )
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS persons (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE REFERENCES applicant_credentials(username),
+        full_name TEXT,
+        name_key TEXT,
+        age INTEGER,
+        age_group TEXT,
+        address TEXT,
+        skills TEXT,
+        education TEXT,
+        experience INTEGER,
+        photo_blob TEXT,
+        photo_hash TEXT,
+        updated_at TEXT
+    )
+    """
+    )
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        person_id INTEGER NOT NULL REFERENCES persons(id),
+        job TEXT NOT NULL,
+        submitted_at TEXT,
+        UNIQUE (person_id, job)
+    )
+    """
+    )
+    # client-generated ids of submissions synced from offline outboxes
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS synced_submissions (
+        uuid TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        person_id INTEGER,
+        received_at TEXT,
+        registered_by TEXT
+    )
+    """
+    )
+    ensure_column(conn, "synced_submissions", "registered_by", "TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_name_key ON persons(name_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_persons_photo_hash ON persons(photo_hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_job ON applications(job)")
+
+    # data version for API ETags: bumped by triggers on every write to
+    # persons/applications, whichever code path (or process) makes it
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """
+    )
+    # checked first: init_schema runs on every Streamlit rerun and must not take a write lock
+    if conn.execute("SELECT 1 FROM meta WHERE key='data_version'").fetchone() is None:
+        conn.execute("INSERT INTO meta (key, value) VALUES ('data_version', 0)")
+    for table in ("persons", "applications"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+    CREATE TRIGGER IF NOT EXISTS bump_version_{table}_{event.lower()} AFTER {event} ON {table}
+    BEGIN
+        UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+    END
+    """
+            )
+    conn.commit()
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        migrate_legacy_applicants(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+
+def migrate_legacy_applicants(conn):
+    """Fold rows of the old flat applicants table into persons/applications."""
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(applicants)").fetchall()]
+    if not cols:
+        return
+    wanted = PROFILE_FIELDS + ["job_applied", "photo_blob", "submitted_at"]
+    select = ", ".join(c if c in cols else f"NULL AS {c}" for c in wanted)
+    for row in conn.execute(f"SELECT {select} FROM applicants ORDER BY rowid").fetchall():
+        rec = dict(zip(wanted, row))
+        profile = {k: rec[k] for k in PROFILE_FIELDS}
+        photo_bytes = base64_to_bytes(rec["photo_blob"])
+        person_id, _ = _upsert_person(conn, None, profile, rec["photo_blob"], photo_bytes)
+        if rec["job_applied"]:
+            conn.execute(
+                "INSERT OR IGNORE INTO applications (person_id, job, submitted_at) VALUES (?, ?, ?)",
+                (person_id, rec["job_applied"], rec["submitted_at"]),
+            )
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now_text():
+    """Submission timestamp stored in applications.submitted_at."""
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def base64_to_bytes(b64_text):
+    """Return bytes from base64 text (or None)."""
+    if not b64_text:
+        return None
+    try:
+        return base64.b64decode(b64_text)
+    except Exception:
+        return None
+
+
+def normalize_name(full_name):
+    """Accent-, case-, punctuation- and order-insensitive key for a person's name.
+
+    "Dela Cruz, Juan" and "juan  DELA cruz" give the same key; placeholders
+    such as "N/A" give None so they never match each other.
+    """
+    if not full_name:
+        return None
+    text = unicodedata.normalize("NFKD", str(full_name)).encode("ascii", "ignore").decode().lower()
+    tokens = re.findall(r"[a-z0-9]+", text)
+    if not tokens or tokens == ["n", "a"]:
+        return None
+    return " ".join(sorted(tokens))
+
+
+MIN_HASH_BITS = 9  # a hash needs at least this many 1 bits and 0 bits to identify anything
+
+
+def image_hash(data):
+    """64-bit average hash (hex) of an image, stable across re-encodes/resizes.
+
+    Falls back to None for bytes PIL cannot decode and for low-information
+    images (blank or mostly-white pages, where almost every bit agrees),
+    which would otherwise all match each other.
+    """
+    if not data:
+        return None
+    try:
+        img = Image.open(io.BytesIO(data)).convert("L").resize((8, 8), Image.LANCZOS)
+    except Exception:
+        return None
+    pixels = list(img.getdata())
+    avg = sum(pixels) / len(pixels)
+    bits = 0
+    for p in pixels:
+        bits = (bits << 1) | (p >= avg)
+    if not MIN_HASH_BITS <= bin(bits).count("1") <= 64 - MIN_HASH_BITS:
+        return None
+    return f"{bits:016x}"
+
+
+def get_age_group(age: int):
+    if 18 <= age <= 21:
+        return "18-21"
+    if 22 <= age <= 25:
+        return "22-25"
+    if 26 <= age <= 30:
+        return "26-30"
+    return None
+
+
+# ---------------------------
+# Reference data
+# ---------------------------
+YOUTH_INDICATORS = {
+    "Age_Group": ["18-21", "22-25", "26-30"],
+    "Unemployment_Rate (%)": [14.5, 10.2, 6.7],
+    "Underemployment_Rate (%)": [22.1, 18.4, 12.9],
+    "NEET_Rate (%)": [19.0, 16.3, 12.5],
+    "Average_Monthly_Wage (PHP)": [9500, 14500, 19800],
+}
+
+JOB_LIST_SIMPLE = [
+    "Cashier (Local Store)",
+    "Service Crew",
+    "Data Encoder",
+    "Barangay Support Staff",
+    "Warehouse Helper",
+    "Factory Worker (Santa Barbara)",
+    "Rice Mill Operator",
+    "Municipal Office Clerk",
+    "Call Center Trainee (Iloilo City)",
+    "IT Assistant Intern",
+    "Barista",
+    "Sales Associate",
+    "Receptionist",
+    "Security Guard",
+    "Warehouse Forklift Operator",
+    "Machine Operator",
+    "Housekeeping Staff",
+    "Driver (Delivery)",
+    "Inventory Clerk",
+    "Customer Service Representative",
+    "Computer Operator",
+    "Field Enumerator",
+]
+
+
+# ---------------------------
+# Persons & applications
+# ---------------------------
+def clean_profile(data):
+    """Validated, normalized copy of the profile fields present in data.
+
+    Text is stripped, age and experience become integers and age_group is
+    always derived from age (a sent age_group is ignored). Fields that are
+    not sent stay out of the result, so an update leaves them untouched.
+    Raises ValueError for invalid values.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("profile must be an object")
+    profile = {}
+    for key in ("full_name", "address", "skills", "education"):
+        if key in data:
+            profile[key] = str(data[key] or "").strip()
+    for key in ("full_name", "address"):
+        if key in profile and not profile[key]:
+            raise ValueError(f"{key} cannot be empty")
+    for key in ("age", "experience"):
+        if key in data:
+            try:
+                profile[key] = int(data[key] or 0)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be an integer")
+    if "age" in profile:
+        profile["age_group"] = get_age_group(profile["age"]) if profile["age"] else None
+    return profile
+
+
+def clean_submission(job, profile=None, photo_b64=None):
+    """Validate one submission; returns (job, profile, photo_b64) or raises ValueError.
+
+    Same rules as the Streamlit form, for the API and synced outboxes alike:
+    a known job and either a resume picture (valid base64) or a profile with
+    a full name and address.
+    """
+    if not isinstance(job, str) or job not in JOB_LIST_SIMPLE:
+        raise ValueError("unknown job")
+    if photo_b64:
+        if not isinstance(photo_b64, str):
+            raise ValueError("photo must be base64 text")
+        try:
+            base64.b64decode(photo_b64, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError("photo is not valid base64")
+    else:
+        photo_b64 = None
+    if profile is not None:
+        profile = clean_profile(profile)
+        if not profile.get("full_name") or not profile.get("address"):
+            raise ValueError("full_name and address are required")
+    elif not photo_b64:
+        raise ValueError("send either a photo or full_name and address")
+    return job, profile, photo_b64
+
+
+def clean_text(value, field):
+    """Stripped text or None; ValueError for anything that is not a string."""
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be text")
+    return value.strip() or None
+
+
+def clean_timestamp(value):
+    """A TIMESTAMP_FORMAT string (now if missing); ValueError otherwise.
+
+    Timestamps are compared as text for last-writer-wins, so any other
+    format (e.g. ISO with a "T") would order wrongly.
+    """
+    if value is None:
+        return now_text()
+    if not isinstance(value, str):
+        raise ValueError("created_at must be text")
+    datetime.strptime(value, TIMESTAMP_FORMAT)  # ValueError if malformed
+    return value
+
+
+def find_person(conn, username, name_key=None, age=None, photo_hash=None):
+    """Return the id of the person a submission belongs to, or None.
+
+    The logged-in account wins; otherwise a near-duplicate among persons not
+    yet tied to another account is looked up by normalized name + image hash,
+    then by normalized name + age (both indexed). A photo never decides
+    identity on its own: without a matching name there is no match.
+    """
+    if username:
+        row = conn.execute("SELECT id FROM persons WHERE username=?", (username,)).fetchone()
+        if row:
+            return row[0]
+    if not name_key:
+        return None
+    if photo_hash:
+        row = conn.execute(
+            "SELECT id FROM persons WHERE name_key=? AND photo_hash=? AND username IS NULL ORDER BY id LIMIT 1",
+            (name_key, photo_hash),
+        ).fetchone()
+        if row:
+            return row[0]
+    row = conn.execute(
+        "SELECT id FROM persons WHERE name_key=? AND age IS ? AND username IS NULL ORDER BY id LIMIT 1",
+        (name_key, age),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _upsert_person(conn, username, profile, photo_b64, photo_bytes, as_of=None):
+    """Insert or update the person row for a submission (no commit).
+
+    Returns (person_id, kept_newer). With as_of (the time the submission was
+    made), a stored profile updated after that time is left as is and
+    kept_newer is True: the most recent write wins. Only the profile fields
+    present in profile are written to an existing person.
+    """
+    name_key = normalize_name(profile.get("full_name")) if profile else None
+    age = profile.get("age") if profile else None
+    photo_hash = image_hash(photo_bytes)
+    person_id = find_person(conn, username, name_key, age, photo_hash)
+
+    if person_id is None:
+        values = dict(EMPTY_PROFILE, **(profile or {}))
+        cur = conn.execute(
+            f"""
+            INSERT INTO persons (username, {", ".join(PROFILE_FIELDS)}, name_key, photo_blob, photo_hash, updated_at)
+            VALUES (?, {", ".join("?" * len(PROFILE_FIELDS))}, ?, ?, ?, ?)
+            """,
+            (username, *[values[k] for k in PROFILE_FIELDS], name_key, photo_b64, photo_hash, now_text()),
+        )
+        return cur.lastrowid, False
+
+    if as_of and (profile or photo_b64):
+        row = conn.execute("SELECT updated_at FROM persons WHERE id=?", (person_id,)).fetchone()
+        if row and row[0] and row[0] > as_of:
+            if username:
+                conn.execute("UPDATE persons SET username=? WHERE id=? AND username IS NULL", (username, person_id))
+            return person_id, True
+
+    if username:
+        # claim a matching unlinked (e.g. migrated) profile for this account
+        conn.execute("UPDATE persons SET username=? WHERE id=? AND username IS NULL", (username, person_id))
+    if profile:
+        values = {k: profile[k] for k in PROFILE_FIELDS if k in profile}
+        if "full_name" in values:
+            values["name_key"] = name_key
+        if values:
+            conn.execute(
+                f"UPDATE persons SET {', '.join(f'{k}=?' for k in values)}, updated_at=? WHERE id=?",
+                (*values.values(), now_text(), person_id),
+            )
+    if photo_b64:
+        # only rewrite the stored photo when its bytes differ; the perceptual
+        # hash is too coarse for this (similar scans share one) and is None
+        # for low-detail ones, so it is used for matching persons only
+        conn.execute(
+            "UPDATE persons SET photo_blob=?, photo_hash=?, updated_at=? WHERE id=? AND photo_blob IS NOT ?",
+            (photo_b64, photo_hash, now_text(), person_id, photo_b64),
+        )
+    return person_id, False
+
+
+def submit_application(conn, username, job, profile=None, photo_b64=None):
+    """Record an application for job; returns (person_id, is_new_application).
+
+    Re-applying for the same job only refreshes the profile; it never adds a
+    second applications row or a second copy of the photo.
+    """
+    photo_bytes = base64_to_bytes(photo_b64)
+    try:
+        person_id, _ = _upsert_person(conn, username, profile, photo_b64, photo_bytes)
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO applications (person_id, job, submitted_at) VALUES (?, ?, ?)",
+            (person_id, job, now_text()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return person_id, cur.rowcount == 1
+
+
+def apply_submissions(conn, submissions):
+    """Apply submissions synced from an offline outbox, exactly once each.
+
+    Each submission is a dict with uuid, created_at, username, registered_by,
+    job, profile and photo_b64; registered_by (the device account that entered
+    it) is only recorded alongside the status. Returns {uuid: status} where status is one of
+      applied    new application recorded
+      duplicate  this person had already applied for the job
+      conflict   application recorded, but the central profile was updated
+                 after the submission was made, so it was kept
+      rejected   fails clean_submission, or a malformed username,
+                 registered_by or created_at (TIMESTAMP_FORMAT)
+    Replaying a uuid returns the status recorded the first time. A submission
+    without a uuid cannot be acknowledged, so it is skipped and gets no entry
+    in the result (the sender keeps it pending).
+    """
+    results = {}
+    try:
+        for sub in submissions:
+            sub_id = sub.get("uuid") if isinstance(sub, dict) else None
+            if not sub_id or not isinstance(sub_id, str):
+                continue
+            row = conn.execute("SELECT status FROM synced_submissions WHERE uuid=?", (sub_id,)).fetchone()
+            if row:
+                results[sub_id] = row[0]
+                continue
+
+            person_id, registered_by = None, None
+            try:
+                job, profile, photo_b64 = clean_submission(sub.get("job"), sub.get("profile"), sub.get("photo_b64"))
+                username = clean_text(sub.get("username"), "username")
+                registered_by = clean_text(sub.get("registered_by"), "registered_by")
+                created_at = clean_timestamp(sub.get("created_at"))
+            except ValueError:
+                status = "rejected"
+            else:
+                person_id, kept_newer = _upsert_person(
+                    conn, username, profile, photo_b64, base64_to_bytes(photo_b64), as_of=created_at
+                )
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO applications (person_id, job, submitted_at) VALUES (?, ?, ?)",
+                    (person_id, job, created_at),
+                )
+                status = "duplicate" if cur.rowcount == 0 else ("conflict" if kept_newer else "applied")
+            conn.execute(
+                "INSERT INTO synced_submissions (uuid, status, person_id, received_at, registered_by) VALUES (?, ?, ?, ?, ?)",
+                (sub_id, status, person_id, now_text(), registered_by),
+            )
+            results[sub_id] = status
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+
+def get_person_photo(conn, person_id):
+    """Base64 photo text for a person (or None)."""
+    row = conn.execute("SELECT photo_blob FROM persons WHERE id=?", (int(person_id),)).fetchone()
+    return row[0] if row else None
+
+
+def delete_application(conn, application_id):
+    """Delete one application and any account-less person left without applications."""
+    conn.execute("DELETE FROM applications WHERE id=?", (int(application_id),))
+    conn.execute(
+        """
+        DELETE FROM persons
+        WHERE username IS NULL AND id NOT IN (SELECT person_id FROM applications)
+        """
+    )
+    conn.commit()
+
+
+# ---------------------------
+# Queries
+# ---------------------------
+def data_version(conn):
+    """Counter that goes up on every write to applications or profiles."""
+    row = conn.execute("SELECT value FROM meta WHERE key='data_version'").fetchone()
+    return str(row[0]) if row else "0"
+
+
+def list_applications(conn, job=None, name=None, limit=50, offset=0):
+    """One page of applications (without photos); returns (total, rows as dicts)."""
+    where, params = [], []
+    if job:
+        where.append("a.job = ?")
+        params.append(job)
+    if name:
+        where.append("p.full_name LIKE ?")
+        params.append(f"%{name}%")
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    total = conn.execute(
+        f"SELECT COUNT(*) FROM applications a JOIN persons p ON p.id = a.person_id {where_sql}", params
+    ).fetchone()[0]
+    cur = conn.execute(
+        f"""
+        SELECT a.id, a.person_id, p.username, p.full_name, p.age, p.age_group, p.address, p.skills,
+               p.education, p.experience, a.job AS job_applied, a.submitted_at,
+               p.photo_blob IS NOT NULL AS has_photo
+        FROM applications a JOIN persons p ON p.id = a.person_id
+        {where_sql}
+        ORDER BY a.id
+        LIMIT ? OFFSET ?
+        """,
+        params + [int(limit), int(offset)],
+    )
+    cols = [d[0] for d in cur.description]
+    return total, [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+def job_counts(conn):
+    """Number of applications per job, sorted by job."""
+    return conn.execute("SELECT job, COUNT(*) FROM applications GROUP BY job ORDER BY job").fetchall()